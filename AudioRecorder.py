@@ -3,7 +3,8 @@ from custom_speech_recognition.RecognizerClasses import Recognizer
 from custom_speech_recognition.audio import AudioData
 
 import sounddevice as sd
-from datetime import datetime
+import threading
+import time
 
 RECORD_TIMEOUT = 3
 ENERGY_THRESHOLD = 1000
@@ -17,17 +18,36 @@ class BaseRecorder:
         self.recorder.dynamic_energy_threshold = DYNAMIC_ENERGY_THRESHOLD
         self.source = source
         self.source_name = source_name
+        self.adjust_thread = None
+        self.adjust_error = None
 
     def adjust_for_noise(self, device_name, msg):
+        # calibrate on a background thread so construction of the other recorder
+        # and the UI can proceed while the ~1 second of ambient audio is sampled
         print(f"[INFO] Adjusting for ambient noise from {device_name}. " + msg)
-        with self.source:
-            self.recorder.adjust_for_ambient_noise(self.source)
-        print(f"[INFO] Completed ambient noise adjustment for {device_name}.")
+
+        def calibrate():
+            try:
+                with self.source:
+                    self.recorder.adjust_for_ambient_noise(self.source)
+            except Exception as error:
+                self.adjust_error = error  # re-raised on the caller's thread when recording starts
+                return
+            print(f"[INFO] Completed ambient noise adjustment for {device_name}.")
+
+        self.adjust_thread = threading.Thread(target=calibrate, daemon=True)
+        self.adjust_thread.start()
 
     def record_into_queue(self, audio_queue):
+        if self.adjust_thread is not None:
+            self.adjust_thread.join()  # recording must not start until calibration has released the source
+            self.adjust_thread = None
+            if self.adjust_error is not None:
+                raise self.adjust_error
+
         def record_callback(_, audio: AudioData) -> None:
             data = audio.get_raw_data()
-            audio_queue.put((self.source_name, data, datetime.utcnow()))
+            audio_queue.put((self.source_name, data, time.monotonic_ns()))  # monotonic timestamps are immune to system clock changes and cheaper than building a datetime
 
         self.recorder.listen_in_background(
             self.source, record_callback, phrase_time_limit=RECORD_TIMEOUT
@@ -47,11 +67,13 @@ class DefaultSpeakerRecorder(BaseRecorder):
         default_speakers = sd.default.device[1]
         default_speakers_info = sd.query_devices(default_speakers)
 
+        sample_rate = int(default_speakers_info["default_samplerate"])
         source = Microphone(
             speaker=True,
             device_index=default_speakers,
-            sample_rate=int(default_speakers_info["default_samplerate"]),
-            chunk_size=default_speakers_info["max_input_channels"],
+            sample_rate=sample_rate,
+            chunk_size=sample_rate // 100,  # 10 ms blocks: low capture latency without per-block overhead dominating
+            channels=default_speakers_info["max_input_channels"],
         )
         super().__init__(source=source, source_name="Speaker")
         self.adjust_for_noise(
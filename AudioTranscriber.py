@@ -2,7 +2,6 @@ import wave
 import threading
 from tempfile import NamedTemporaryFile
 import io
-from datetime import timedelta
 from heapq import merge
 from faster_whisper import WhisperModel
 
@@ -10,6 +9,8 @@ from custom_speech_recognition.audio import AudioData
 
 PHRASE_TIMEOUT = 3.05
 
+PHRASE_TIMEOUT_NS = int(PHRASE_TIMEOUT * 1e9)  # queue timestamps come from time.monotonic_ns()
+
 MAX_PHRASES = 10
 
 
@@ -55,9 +56,10 @@ class AudioTranscriber:
 
     def update_last_sample_and_phrase_status(self, who_spoke, data, time_spoken):
         source_info = self.audio_sources[who_spoke]
-        if source_info["last_spoken"] and time_spoken - source_info[
-            "last_spoken"
-        ] > timedelta(seconds=PHRASE_TIMEOUT):
+        if (
+            source_info["last_spoken"]
+            and time_spoken - source_info["last_spoken"] > PHRASE_TIMEOUT_NS
+        ):
             source_info["last_sample"] = bytes()
             source_info["new_phrase"] = True
         else:
@@ -1,9 +1,13 @@
 import aifc
+import array
 import audioop
 import io
 import os
 import subprocess
 import wave
+
+import numpy as np
+
 from custom_speech_recognition.AudioSource import AudioSource
 from .audio import get_flac_converter
 
@@ -21,13 +25,16 @@ class AudioFile(AudioSource):
     Both AIFF and AIFF-C (compressed AIFF) formats are supported.
 
     FLAC files must be in native FLAC format; OGG-FLAC is not supported and may result in undefined behaviour.
+
+    If ``convert_to_mono`` is false, stereo audio is passed through unchanged and the source's channel count is exposed as ``CHANNELS``. Consumers that handle multiple channels themselves (for example, ``AudioData.get_wav_data`` with ``nchannels``) can then skip the downmix entirely.
     """
 
-    def __init__(self, filename_or_fileobject):
+    def __init__(self, filename_or_fileobject, convert_to_mono=True):
         assert isinstance(filename_or_fileobject, (type(""), type(""))) or hasattr(
             filename_or_fileobject, "read"
         ), "Given audio file must be a filename string or a file-like object"
         self.filename_or_fileobject = filename_or_fileobject
+        self.convert_to_mono = convert_to_mono
         self.stream = None
         self.DURATION = None
 
@@ -36,64 +43,161 @@ class AudioFile(AudioSource):
         self.SAMPLE_RATE = None
         self.CHUNK = None
         self.FRAME_COUNT = None
+        self.CHANNELS = None
 
-    def __enter__(self):
-        assert (
-            self.stream is None
-        ), "This audio source is already inside a context manager"
-        try:
-            # attempt to read the file as WAV
-            self.audio_reader = wave.open(self.filename_or_fileobject, "rb")
-            self.little_endian = True  # RIFF WAV is a little-endian format (most ``audioop`` operations assume that the frames are stored in little-endian form)
-        except (wave.Error, EOFError):
+        self._decoded_flac = None  # ``(container, data)`` from the last FLAC decode, so re-entering the same unchanged file skips the decode entirely
+        self._decoded_flac_mtime = None  # modification time of the file the cached decode came from; a changed mtime invalidates the cache
+
+    def _open_audio_reader(self, format_hint):
+        """Opens ``filename_or_fileobject`` with the WAV, AIFF, then FLAC readers, skipping any that ``format_hint`` rules out, and returns an ``(audio_reader, little_endian)`` pair."""
+        if format_hint not in ("aiff", "flac"):
+            try:
+                # attempt to read the file as WAV
+                return (
+                    wave.open(self.filename_or_fileobject, "rb"),
+                    True,  # RIFF WAV is a little-endian format (most ``audioop`` operations assume that the frames are stored in little-endian form)
+                )
+            except (wave.Error, EOFError):
+                pass
+        if format_hint != "flac":
             try:
                 # attempt to read the file as AIFF
-                self.audio_reader = aifc.open(self.filename_or_fileobject, "rb")
-                self.little_endian = False  # AIFF is a big-endian format
+                return (
+                    aifc.open(self.filename_or_fileobject, "rb"),
+                    False,  # AIFF is a big-endian format
+                )
             except (aifc.Error, EOFError):
-                # attempt to read the file as FLAC
-                if hasattr(self.filename_or_fileobject, "read"):
-                    flac_data = self.filename_or_fileobject.read()
-                else:
-                    with open(self.filename_or_fileobject, "rb") as f:
-                        flac_data = f.read()
-
-                # run the FLAC converter with the FLAC data to get the AIFF data
-                flac_converter = get_flac_converter()
-                if (
-                    os.name == "nt"
-                ):  # on Windows, specify that the process is to be started without showing a console window
-                    startup_info = subprocess.STARTUPINFO()
-                    startup_info.dwFlags |= (
-                        subprocess.STARTF_USESHOWWINDOW
-                    )  # specify that the wShowWindow field of `startup_info` contains a value
-                    startup_info.wShowWindow = (
-                        subprocess.SW_HIDE
-                    )  # specify that the console window should be hidden
-                else:
-                    startup_info = None  # default startupinfo
+                pass
+
+        # attempt to read the file as FLAC
+        if hasattr(self.filename_or_fileobject, "read"):
+            flac_path = None
+            flac_mtime = None  # file-like objects can't be cached by modification time
+            flac_data = self.filename_or_fileobject.read()
+        else:
+            flac_path = self.filename_or_fileobject
+            flac_mtime = os.path.getmtime(flac_path)
+            if (
+                self._decoded_flac is not None
+                and self._decoded_flac_mtime == flac_mtime
+            ):  # the file hasn't changed since the previous entry, so reuse the decoded audio instead of re-reading and re-decoding it
+                container, decoded = self._decoded_flac
+                if container == "wav":
+                    return wave.open(io.BytesIO(decoded), "rb"), True
+                return aifc.open(io.BytesIO(decoded), "rb"), False
+            flac_data = None  # path-based input is streamed straight from disk by whichever decoder runs, never buffered here
+
+        try:
+            import soundfile as sf  # in-process FLAC decoding via libsndfile, which avoids spawning a converter subprocess per file open
+        except ImportError:
+            sf = None
+        if sf is not None:
+            try:
+                frames, flac_sample_rate = sf.read(
+                    flac_path if flac_path is not None else io.BytesIO(flac_data),
+                    dtype="int16",
+                )
+            except Exception:
+                pass  # libsndfile couldn't decode it either; fall back to the FLAC converter below, which produces the usual error for corrupt files
+            else:
+                wav_file = io.BytesIO()
+                wav_writer = wave.open(wav_file, "wb")
+                try:
+                    wav_writer.setframerate(flac_sample_rate)
+                    wav_writer.setsampwidth(2)
+                    wav_writer.setnchannels(
+                        frames.shape[1] if frames.ndim > 1 else 1
+                    )
+                    wav_writer.writeframes(frames.tobytes())
+                finally:
+                    wav_writer.close()
+                if flac_mtime is not None:
+                    self._decoded_flac = ("wav", wav_file.getvalue())
+                    self._decoded_flac_mtime = flac_mtime
+                wav_file.seek(0)
+                return (
+                    wave.open(wav_file, "rb"),
+                    True,  # the decoded samples were written back out as RIFF WAV above
+                )
+
+        # run the FLAC converter with the FLAC data to get the AIFF data
+        flac_converter = get_flac_converter()
+        if (
+            os.name == "nt"
+        ):  # on Windows, specify that the process is to be started without showing a console window
+            startup_info = subprocess.STARTUPINFO()
+            startup_info.dwFlags |= (
+                subprocess.STARTF_USESHOWWINDOW
+            )  # specify that the wShowWindow field of `startup_info` contains a value
+            startup_info.wShowWindow = (
+                subprocess.SW_HIDE
+            )  # specify that the console window should be hidden
+        else:
+            startup_info = None  # default startupinfo
+        flac_converter_command = [
+            flac_converter,
+            "--stdout",
+            "--totally-silent",  # put the resulting AIFF file in stdout, and make sure it's not mixed with any program output
+            "--decode",
+            "--force-aiff-format",  # decode the FLAC file into an AIFF file
+            "-",  # the input FLAC file contents will be given in stdin
+        ]
+        if flac_path is not None:
+            with open(
+                flac_path, "rb"
+            ) as flac_file:  # hook the file straight to the converter's stdin, so the decode overlaps the disk reads instead of waiting on a full in-memory copy
                 process = subprocess.Popen(
-                    [
-                        flac_converter,
-                        "--stdout",
-                        "--totally-silent",  # put the resulting AIFF file in stdout, and make sure it's not mixed with any program output
-                        "--decode",
-                        "--force-aiff-format",  # decode the FLAC file into an AIFF file
-                        "-",  # the input FLAC file contents will be given in stdin
-                    ],
-                    stdin=subprocess.PIPE,
+                    flac_converter_command,
+                    stdin=flac_file,
                     stdout=subprocess.PIPE,
                     startupinfo=startup_info,
                 )
-                aiff_data, _ = process.communicate(flac_data)
-                aiff_file = io.BytesIO(aiff_data)
-                try:
-                    self.audio_reader = aifc.open(aiff_file, "rb")
-                except (aifc.Error, EOFError):
-                    raise ValueError(
-                        "Audio file could not be read as PCM WAV, AIFF/AIFF-C, or Native FLAC; check if file is corrupted or in another format"
-                    )
-                self.little_endian = False  # AIFF is a big-endian format
+                aiff_data, _ = process.communicate()
+        else:
+            process = subprocess.Popen(
+                flac_converter_command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                startupinfo=startup_info,
+            )
+            aiff_data, _ = process.communicate(flac_data)
+        aiff_file = io.BytesIO(aiff_data)
+        try:
+            audio_reader = aifc.open(aiff_file, "rb")
+        except (aifc.Error, EOFError):
+            raise ValueError(
+                "Audio file could not be read as PCM WAV, AIFF/AIFF-C, or Native FLAC; check if file is corrupted or in another format"
+            )
+        if flac_mtime is not None:
+            self._decoded_flac = ("aiff", aiff_data)
+            self._decoded_flac_mtime = flac_mtime
+        return audio_reader, False  # AIFF is a big-endian format
+
+    def __enter__(self):
+        assert (
+            self.stream is None
+        ), "This audio source is already inside a context manager"
+        # use the filename extension as a hint for which reader to try first, so AIFF and FLAC files skip the readers their extension rules out; unrecognized or missing extensions keep the full fallback chain
+        format_hint = None
+        if not hasattr(self.filename_or_fileobject, "read"):
+            extension = os.path.splitext(self.filename_or_fileobject)[1].lower()
+            format_hint = {
+                ".wav": "wav",
+                ".wave": "wav",
+                ".aiff": "aiff",
+                ".aifc": "aiff",
+                ".flac": "flac",
+            }.get(extension)
+
+        try:
+            self.audio_reader, self.little_endian = self._open_audio_reader(
+                format_hint
+            )
+        except ValueError:
+            if format_hint is None:
+                raise
+            # the extension hint was wrong (e.g., a PCM WAV named ``.flac``), so retry with the full reader chain before giving up
+            self.audio_reader, self.little_endian = self._open_audio_reader(None)
         assert (
             1 <= self.audio_reader.getnchannels() <= 2
         ), "Audio must be mono or stereo"
@@ -116,10 +220,14 @@ class AudioFile(AudioSource):
         self.CHUNK = 4096
         self.FRAME_COUNT = self.audio_reader.getnframes()
         self.DURATION = self.FRAME_COUNT / float(self.SAMPLE_RATE)
+        self.CHANNELS = (
+            1 if self.convert_to_mono else self.audio_reader.getnchannels()
+        )
         self.stream = AudioFile.AudioFileStream(
             self.audio_reader,
             self.little_endian,
             samples_24_bit_pretending_to_be_32_bit,
+            self.convert_to_mono,
         )
         return self
 
@@ -133,13 +241,20 @@ class AudioFile(AudioSource):
 
     class AudioFileStream(object):
         def __init__(
-            self, audio_reader, little_endian, samples_24_bit_pretending_to_be_32_bit
+            self,
+            audio_reader,
+            little_endian,
+            samples_24_bit_pretending_to_be_32_bit,
+            convert_to_mono=True,
         ):
             self.audio_reader = (
                 audio_reader  # an audio file object (e.g., a `wave.Wave_read` instance)
             )
             self.little_endian = little_endian  # whether the audio data is little-endian (when working with big-endian things, we'll have to convert it to little-endian before we process it)
             self.samples_24_bit_pretending_to_be_32_bit = samples_24_bit_pretending_to_be_32_bit  # this is true if the audio is 24-bit audio, but 24-bit audio isn't supported, so we have to pretend that this is 32-bit audio and convert it on the fly
+            self.convert_to_mono = convert_to_mono  # when false, stereo data is passed through untouched and the consumer is expected to handle the interleaved channels itself
+            self._mix_scratch = None  # reusable int32 buffer for the stereo downmix, grown to the largest chunk seen so far to avoid a fresh allocation on every read
+            self._mono_out = None  # reusable int16 output buffer for the stereo downmix
 
         def read(self, size=-1):
             buffer = self.audio_reader.readframes(
@@ -156,23 +271,43 @@ class AudioFile(AudioSource):
                     audioop, "byteswap"
                 ):  # ``audioop.byteswap`` was only added in Python 3.4 (incidentally, that also means that we don't need to worry about 24-bit audio being unsupported, since Python 3.4+ always has that functionality)
                     buffer = audioop.byteswap(buffer, sample_width)
-                else:  # manually reverse the bytes of each sample, which is slower but works well enough as a fallback
-                    buffer = buffer[sample_width - 1 :: -1] + b"".join(
-                        buffer[i + sample_width : i : -1]
-                        for i in range(sample_width - 1, len(buffer), sample_width)
+                elif sample_width == 2:  # the common 16-bit case swaps fastest through ``array.byteswap``, which runs in C without any reshaping
+                    swapped = array.array("h", buffer)
+                    swapped.byteswap()
+                    buffer = swapped.tobytes()
+                else:  # reverse the bytes of each sample with a vectorized NumPy view, rather than a Python loop over every sample
+                    buffer = (
+                        np.frombuffer(buffer, dtype=np.uint8)
+                        .reshape(-1, sample_width)[:, ::-1]
+                        .tobytes()
                     )
 
             # workaround for https://bugs.python.org/issue12866
             if (
                 self.samples_24_bit_pretending_to_be_32_bit
             ):  # we need to convert samples from 24-bit to 32-bit before we can process them with ``audioop`` functions
-                buffer = b"".join(
-                    b"\x00" + buffer[i : i + sample_width]
-                    for i in range(0, len(buffer), sample_width)
-                )  # since we're in little endian, we prepend a zero byte to each 24-bit sample to get a 32-bit sample
+                src = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, sample_width)
+                out = np.zeros((src.shape[0], 4), dtype=np.uint8)
+                out[:, 1:] = src  # since we're in little endian, we prepend a zero byte to each 24-bit sample to get a 32-bit sample
+                buffer = out.tobytes()
                 sample_width = 4  # make sure we thread the buffer as 32-bit audio now, after converting it from 24-bit audio
-            if self.audio_reader.getnchannels() != 1:  # stereo audio
-                buffer = audioop.tomono(
-                    buffer, sample_width, 1, 1
-                )  # convert stereo audio data to mono
+            if (
+                self.convert_to_mono and self.audio_reader.getnchannels() != 1
+            ):  # stereo audio
+                if sample_width == 2:  # 16-bit audio (the common case): vectorized downmix instead of the deprecated ``audioop.tomono``
+                    samples = np.frombuffer(buffer, dtype="<i2").reshape(-1, 2)
+                    frame_count = samples.shape[0]
+                    if self._mix_scratch is None or self._mix_scratch.shape[0] < frame_count:
+                        self._mix_scratch = np.empty(frame_count, dtype=np.int32)
+                        self._mono_out = np.empty(frame_count, dtype="<i2")
+                    mixed = self._mix_scratch[:frame_count]
+                    np.add(samples[:, 0], samples[:, 1], out=mixed, dtype=np.int32)
+                    np.right_shift(mixed, 1, out=mixed)
+                    out = self._mono_out[:frame_count]
+                    out[:] = mixed
+                    buffer = out.tobytes()
+                else:
+                    buffer = audioop.tomono(
+                        buffer, sample_width, 1, 1
+                    )  # convert stereo audio data to mono
             return buffer
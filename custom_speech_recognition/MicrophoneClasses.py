@@ -1,17 +1,23 @@
 from custom_speech_recognition.AudioSource import AudioSource
-import soundcard as sc
 import sounddevice as sd
 
+_cached_devices = None  # memoized result of ``sd.query_devices()``; enumerating devices hits the host API and is slow enough to matter when several sources are constructed
+
+
+def _query_devices_cached():
+    global _cached_devices
+    if _cached_devices is None:
+        _cached_devices = sd.query_devices()
+    return _cached_devices
+
 
 class Microphone(AudioSource):
     """
     Creates a new ``Microphone`` instance, which represents a physical microphone on the computer. Subclass of ``AudioSource``.
 
-    This will throw an ``AttributeError`` if you don't have PyAudio 0.2.11 or later installed.
-
     If ``device_index`` is unspecified or ``None``, the default microphone is used as the audio source. Otherwise, ``device_index`` should be the index of the device to use for audio input.
 
-    A device index is an integer between 0 and ``pyaudio.get_device_count() - 1`` (assume we have used ``import pyaudio`` beforehand) inclusive. It represents an audio device such as a microphone or speaker. See the `PyAudio documentation <http://people.csail.mit.edu/hubert/pyaudio/docs/>`__ for more details.
+    A device index is an integer between 0 and ``len(sounddevice.query_devices()) - 1`` inclusive. It represents an audio device such as a microphone or speaker. See the `sounddevice documentation <https://python-sounddevice.readthedocs.io/>`__ for more details.
 
     The microphone audio is recorded in chunks of ``chunk_size`` samples, at a rate of ``sample_rate`` samples per second (Hertz). If not specified, the value of ``sample_rate`` is determined automatically from the system's microphone settings.
 
@@ -33,7 +39,7 @@ class Microphone(AudioSource):
         self.channels = channels
         self.CHUNK = chunk_size
 
-        devices = sd.query_devices()
+        devices = _query_devices_cached()
         count = len(devices)
 
         if device_index is not None:
@@ -61,6 +67,12 @@ class Microphone(AudioSource):
         self.audio = None
         self.stream = None
 
+    @classmethod
+    def invalidate_device_cache(cls):
+        """Clears the memoized device list, so the next ``Microphone`` construction re-enumerates the hardware. Call this after plugging in or removing an audio device."""
+        global _cached_devices
+        _cached_devices = None
+
     def __enter__(self):
         assert (
             self.stream is None
@@ -72,10 +84,11 @@ class Microphone(AudioSource):
             if self.speaker:
                 self.stream = self.audio.InputStream(
                     device=1,
-                    channels=2,
+                    channels=self.channels,
                     dtype=self.format,  # You may need to adjust the format to match sounddevice's data types (e.g., 'float32')
                     samplerate=self.SAMPLE_RATE,
                     blocksize=self.CHUNK,
+                    latency="low",  # ask PortAudio for its low-latency period size for this device
                 )
             else:
                 self.stream = self.audio.InputStream(
@@ -84,6 +97,7 @@ class Microphone(AudioSource):
                     dtype=self.format,  # You may need to adjust the format to match sounddevice's data types (e.g., 'float32')
                     samplerate=self.SAMPLE_RATE,
                     blocksize=self.CHUNK,
+                    latency="low",  # ask PortAudio for its low-latency period size for this device
                 )
             self.stream.start()
         except Exception:
@@ -112,8 +112,11 @@ class AudioData(object):
                 except (
                     audioop.error
                 ):  # this version of audioop doesn't support 24-bit audio (probably Python 3.3 or less)
+                    raw_data_view = memoryview(
+                        raw_data
+                    )  # memoryview slices reference the source buffer instead of allocating a bytes copy per sample
                     raw_data = b"".join(
-                        raw_data[i + 1 : i + 4]
+                        raw_data_view[i + 1 : i + 4]
                         for i in range(0, len(raw_data), 4)
                     )  # since we're in little endian, we discard the first byte from each 32-bit sample to get a 24-bit sample
                 else:  # 24-bit audio fully supported, we don't need to shim anything
@@ -258,8 +261,14 @@ class AudioData(object):
         return flac_data
 
 
+_flac_converter_path = None  # cached result of ``get_flac_converter``, so the PATH search and executable check only run once per process
+
+
 def get_flac_converter():
     """Returns the absolute path of a FLAC converter executable, or raises an OSError if none can be found."""
+    global _flac_converter_path
+    if _flac_converter_path is not None:
+        return _flac_converter_path
     flac_converter = shutil_which("flac")  # check for installed version first
     if flac_converter is None:  # flac utility is not installed
         base_path = os.path.dirname(
@@ -305,6 +314,7 @@ def get_flac_converter():
     except OSError:
         pass
 
+    _flac_converter_path = flac_converter
     return flac_converter
 
 
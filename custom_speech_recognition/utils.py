@@ -1,132 +1,120 @@
-import audioop
 import json
 import os
 import tempfile
-from urllib.error import URLError
-from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
 import uuid
 
-from requests import HTTPError, Request
-from custom_speech_recognition.MicrophoneClasses import Microphone
+import numpy as np
+import sounddevice as sd
 
-from custom_speech_recognition.RecognizerClasses import Recognizer
 from custom_speech_recognition.exceptions import RequestError, UnknownValueError
 
 
-@staticmethod
 def list_microphone_names():
     """
     Returns a list of the names of all available microphones. For microphones where the name can't be retrieved, the list entry contains ``None`` instead.
 
     The index of each microphone's name in the returned list is the same as its device index when creating a ``Microphone`` instance - if you want to use the microphone at index 3 in the returned list, use ``Microphone(device_index=3)``.
     """
-    audio = Microphone.get_pyaudio().PyAudio()
+    return [device_info.get("name") for device_info in sd.query_devices()]
+
+
+def _probe_microphone(device_index, device_info):
+    """Captures a short buffer from ``device_index`` and returns the debiased RMS energy of the audio, or ``None`` if the device can't be read."""
     try:
-        result = []
-        for i in range(audio.get_device_count()):
-            device_info = audio.get_device_info_by_index(i)
-            result.append(device_info.get("name"))
-    finally:
-        audio.terminate()
-    return result
+        # read audio
+        with sd.InputStream(
+            device=device_index,
+            channels=1,
+            dtype="int16",
+            samplerate=int(device_info["default_samplerate"]),
+        ) as stream:
+            buffer, _ = stream.read(1024)
+    except Exception:
+        return None
+
+    # compute RMS of debiased audio in a single vectorized pass (subtract the DC offset, then take the root mean square)
+    samples = buffer[:, 0].astype(np.float64)
+    return np.sqrt(np.mean((samples - samples.mean()) ** 2))
 
 
-@staticmethod
 def list_working_microphones():
     """
     Returns a dictionary mapping device indices to microphone names, for microphones that are currently hearing sounds. When using this function, ensure that your microphone is unmuted and make some noise at it to ensure it will be detected as working.
 
     Each key in the returned dictionary can be passed to the ``Microphone`` constructor to use that microphone. For example, if the return value is ``{3: "HDA Intel PCH: ALC3232 Analog (hw:1,0)"}``, you can do ``Microphone(device_index=3)`` to use that microphone.
     """
-    pyaudio_module = Microphone.get_pyaudio()
-    audio = pyaudio_module.PyAudio()
-    try:
-        result = {}
-        for device_index in range(audio.get_device_count()):
-            device_info = audio.get_device_info_by_index(device_index)
-            device_name = device_info.get("name")
-            assert (
-                isinstance(device_info.get("defaultSampleRate"), (float, int))
-                and device_info["defaultSampleRate"] > 0
-            ), "Invalid device info returned from PyAudio: {}".format(device_info)
-            try:
-                # read audio
-                pyaudio_stream = audio.open(
-                    input_device_index=device_index,
-                    channels=1,
-                    format=pyaudio_module.paInt16,
-                    rate=int(device_info["defaultSampleRate"]),
-                    input=True,
-                )
-                try:
-                    buffer = pyaudio_stream.read(1024)
-                    if not pyaudio_stream.is_stopped():
-                        pyaudio_stream.stop_stream()
-                finally:
-                    pyaudio_stream.close()
-            except Exception:
-                continue
-
-            # compute RMS of debiased audio
-            energy = -audioop.rms(buffer, 2)
-            energy_bytes = bytes([energy & 0xFF, (energy >> 8) & 0xFF])
-            debiased_energy = audioop.rms(
-                audioop.add(buffer, energy_bytes * (len(buffer) // 2), 2), 2
-            )
-
-            if debiased_energy > 30:  # probably actually audio
-                result[device_index] = device_name
-    finally:
-        audio.terminate()
+    candidates = []
+    for device_index, device_info in enumerate(sd.query_devices()):
+        if (
+            device_info.get("max_input_channels", 0) <= 0
+        ):  # output-only device; opening an input stream on it would fail after a costly probe
+            continue
+        assert (
+            isinstance(device_info.get("default_samplerate"), (float, int))
+            and device_info["default_samplerate"] > 0
+        ), "Invalid device info returned from sounddevice: {}".format(device_info)
+        candidates.append((device_index, device_info))
+
+    # each probe blocks on the host API for tens to hundreds of milliseconds, so run them concurrently instead of one after another
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        energies = {
+            device_index: executor.submit(_probe_microphone, device_index, device_info)
+            for device_index, device_info in candidates
+        }
+
+    result = {}
+    for device_index, device_info in candidates:
+        debiased_energy = energies[device_index].result()
+        if debiased_energy is not None and debiased_energy > 30:  # probably actually audio
+            result[device_index] = device_info.get("name")
     return result
 
 
 def recognize_api(
-    self,
     audio_data,
     client_access_token,
     language="en",
     session_id=None,
     show_all=False,
 ):
+    """Performs speech recognition on ``audio_data`` (an ``AudioData`` instance), using the api.ai Speech Recognition API. Deprecated/not recommended as of 3.5.0, and currently only optionally available for paid plans."""
     wav_data = audio_data.get_wav_data(convert_rate=16000, convert_width=2)
     url = "https://api.api.ai/v1/query"
-    while True:
-        boundary = uuid.uuid4().hex
-        if boundary.encode("utf-8") not in wav_data:
-            break
+    boundary = uuid.uuid4().hex  # 128 bits of randomness; a collision with the audio payload is not a realistic concern, so don't scan the whole WAV for one
     if session_id is None:
         session_id = uuid.uuid4().hex
-    data = (
-        b"--"
-        + boundary.encode("utf-8")
-        + b"\r\n"
-        + b'Content-Disposition: form-data; name="request"\r\n'
-        + b"Content-Type: application/json\r\n"
-        + b"\r\n"
-        + b'{"v": "20150910", "sessionId": "'
+    # build only the framing around the WAV payload; the payload itself is streamed as its own segment instead of being copied into one contiguous body
+    head = bytearray()
+    head += b"--" + boundary.encode("utf-8") + b"\r\n"
+    head += b'Content-Disposition: form-data; name="request"\r\n'
+    head += b"Content-Type: application/json\r\n"
+    head += b"\r\n"
+    head += (
+        b'{"v": "20150910", "sessionId": "'
         + session_id.encode("utf-8")
         + b'", "lang": "'
         + language.encode("utf-8")
         + b'"}\r\n'
-        + b"--"
-        + boundary.encode("utf-8")
-        + b"\r\n"
-        + b'Content-Disposition: form-data; name="voiceData"; filename="audio.wav"\r\n'
-        + b"Content-Type: audio/wav\r\n"
-        + b"\r\n"
-        + wav_data
-        + b"\r\n"
-        + b"--"
-        + boundary.encode("utf-8")
-        + b"--\r\n"
     )
+    head += b"--" + boundary.encode("utf-8") + b"\r\n"
+    head += b'Content-Disposition: form-data; name="voiceData"; filename="audio.wav"\r\n'
+    head += b"Content-Type: audio/wav\r\n"
+    head += b"\r\n"
+    head = bytes(head)
+    tail = b"\r\n--" + boundary.encode("utf-8") + b"--\r\n"
     request = Request(
         url,
-        data=data,
+        data=(
+            head,
+            wav_data,
+            tail,
+        ),  # ``http.client`` sends each segment of an iterable body separately, so the WAV data is written straight from its own buffer
         headers={
             "Authorization": "Bearer {}".format(client_access_token),
-            "Content-Length": str(len(data)),
+            "Content-Length": str(len(head) + len(wav_data) + len(tail)),
             "Expect": "100-continue",
             "Content-Type": "multipart/form-data; boundary={}".format(boundary),
         },
@@ -150,11 +138,6 @@ def recognize_api(
     return result["result"]["resolvedQuery"]
 
 
-Recognizer.recognize_api = classmethod(
-    recognize_api
-)  # API.AI Speech Recognition is deprecated/not recommended as of 3.5.0, and currently is only optionally available for paid plans
-
-
 class PortableNamedTemporaryFile(object):
     """Limited replacement for ``tempfile.NamedTemporaryFile``, except unlike ``tempfile.NamedTemporaryFile``, the file can be opened again while it's currently open, even on Windows."""
 
@@ -162,8 +145,10 @@ class PortableNamedTemporaryFile(object):
         self.mode = mode
 
     def __enter__(self):
-        # create the temporary file and open it
-        file_descriptor, file_path = tempfile.mkstemp()
+        # create the temporary file and open it; prefer the memory-backed tmpfs on Linux so short-lived files never touch the disk (consumers read the file back by name, so a truly anonymous file isn't an option)
+        memory_backed_dir = "/dev/shm"
+        temp_dir = memory_backed_dir if os.path.isdir(memory_backed_dir) else None
+        file_descriptor, file_path = tempfile.mkstemp(dir=temp_dir)
         self._file = os.fdopen(file_descriptor, self.mode)
 
         # the name property is a public field
@@ -4,7 +4,6 @@ from GPTResponder import GPTResponder
 import customtkinter as ctk
 import AudioRecorder
 import queue
-import time
 import torch
 
 """Library for performing speech recognition, with support for several engines and APIs, online and offline."""
@@ -112,12 +111,11 @@ def main():
 
     audio_queue = queue.Queue()
 
+    # construct both recorders before starting either one, so their ambient noise calibrations run concurrently
     user_audio_recorder = AudioRecorder.DefaultMicRecorder()
-    user_audio_recorder.record_into_queue(audio_queue)
-
-    time.sleep(2)
-
     speaker_audio_recorder = AudioRecorder.DefaultSpeakerRecorder()
+
+    user_audio_recorder.record_into_queue(audio_queue)
     speaker_audio_recorder.record_into_queue(audio_queue)
 
     global_transcriber = AudioTranscriber(